@@ -0,0 +1,32 @@
+import shutil
+
+import pytest
+from typer.testing import CliRunner
+
+from fossbox import cli
+
+
+@pytest.fixture
+def fake_systemd_run(monkeypatch):
+    # Stand-in that accepts any arguments, so the wrapped launch path is taken
+    monkeypatch.setattr(cli, "_systemd_run_path", lambda: shutil.which("true"))
+
+
+def test_no_limit_options_runs_direct(fake_systemd_run):
+    result = CliRunner().invoke(cli.app, ["run", "--", "true"])
+    assert result.exit_code == 0, result.output
+    assert "direct (no limits requested)" in result.output
+    assert "[fossbox] limits:" not in result.output
+
+
+def test_explicit_default_values_are_enforced(fake_systemd_run):
+    result = CliRunner().invoke(cli.app, ["run", "--cpus", "1", "--ram", "1G", "--", "true"])
+    assert result.exit_code == 0, result.output
+    assert "systemd (scope)" in result.output
+    assert "limits: cpus=1.0 (CPUQuota=100%), ram=1G" in result.output
+
+
+def test_timeout_alone_uses_default_caps(fake_systemd_run):
+    result = CliRunner().invoke(cli.app, ["run", "--timeout", "5", "--", "true"])
+    assert result.exit_code == 0, result.output
+    assert "limits: cpus=1.0 (CPUQuota=100%), ram=1G, timeout=5" in result.output
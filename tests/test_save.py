@@ -0,0 +1,197 @@
+import errno
+import glob
+import os
+
+import pytest
+from typer.testing import CliRunner
+
+from fossbox import cli
+
+FILES = [
+    "scan.xml",
+    "scan.gnmap",
+    "report.txt",
+    ".hidden.xml",
+    "sub/a.xml",
+    "sub/deep/b.xml",
+    "out/c.txt",
+    "out/deep/d.txt",
+    ".git/config",
+    ".cache/e.xml",
+    "r/f.txt",
+    "r/g.xml",
+]
+
+# name -> target (relative to the link's directory)
+LINKS = {
+    "latest": "r",
+    "link.xml": "scan.xml",
+}
+
+PATTERNS = [
+    "*",
+    "*.xml",
+    "**/*.xml",
+    "out/*",
+    "out/**",
+    "**",
+    "*/*.xml",
+    "sub/**/*.xml",
+    ".*",
+    ".*/*",
+    "scan.*",
+    "?can.xml",
+    "[rs]*.txt",
+    "out/*/d.txt",
+    "latest/*.txt",
+    "*/*.txt",
+    "latest/**",
+]
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    root = tmp_path / "work"
+    for rel in FILES:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel)
+    for rel, target in LINKS.items():
+        os.symlink(target, root / rel)
+    return root
+
+
+def _glob_files(root, pat):
+    """What the original glob-based --save loop picked up for one pattern."""
+    cut = len(os.path.join(str(root), ""))
+    return {
+        match[cut:]
+        for match in glob.glob(os.path.join(str(root), pat), recursive=True)
+        if os.path.isfile(match)
+    }
+
+
+@pytest.mark.parametrize("pat", PATTERNS)
+def test_match_saved_agrees_with_glob(workspace, pat):
+    assert cli._match_saved(str(workspace), [pat]) == _glob_files(workspace, pat)
+
+
+def test_match_saved_skips_symlink_loops(workspace):
+    # glob itself recurses until ELOOP here; we stop at the link instead
+    os.symlink("..", workspace / "sub" / "deep" / "up")
+    assert cli._match_saved(str(workspace), ["sub/**/*.xml"]) == {"sub/a.xml", "sub/deep/b.xml"}
+
+
+def test_match_saved_multiple_patterns(workspace):
+    pats = ["*.xml", "out/*", "report.txt"]
+    expected = set().union(*(_glob_files(workspace, p) for p in pats))
+    assert cli._match_saved(str(workspace), pats) == expected
+
+
+def test_match_saved_examples(workspace):
+    root = str(workspace)
+    assert cli._match_saved(root, ["**/*.xml"]) == {
+        "scan.xml", "link.xml", "sub/a.xml", "sub/deep/b.xml", "r/g.xml", "latest/g.xml",
+    }
+    assert cli._match_saved(root, ["out/*"]) == {"out/c.txt"}
+    assert cli._match_saved(root, ["*.xml"]) == {"scan.xml", "link.xml"}
+    assert cli._match_saved(root, ["*"]) == {"scan.xml", "scan.gnmap", "report.txt", "link.xml"}
+    assert cli._match_saved(root, ["latest/*.txt"]) == {"latest/f.txt"}
+    assert cli._match_saved(root, [".git/config", "missing.txt"]) == {".git/config"}
+
+
+def test_run_saves_matching_files(tmp_path):
+    out = tmp_path / "out"
+    result = CliRunner().invoke(cli.app, [
+        "run", "--out", str(out), "--save", "*.xml,out/*", "--",
+        "sh", "-c", "mkdir -p sub out/deep; echo a > a.xml; echo b > sub/b.xml; "
+                    "echo c > out/c.txt; echo d > out/deep/d.txt",
+    ])
+    assert result.exit_code == 0, result.output
+    assert sorted(os.listdir(out)) == ["a.xml", "c.txt"]
+    assert "saved 2 file(s)" in result.output
+
+
+def test_run_saves_symlink_contents(tmp_path):
+    out = tmp_path / "out"
+    result = CliRunner().invoke(cli.app, [
+        "run", "--out", str(out), "--save", "*.xml", "--",
+        "sh", "-c", "echo scan > scan-1.data; ln -s scan-1.data latest.xml",
+    ])
+    assert result.exit_code == 0, result.output
+    saved = out / "latest.xml"
+    assert not saved.is_symlink()
+    assert saved.read_text() == "scan\n"
+
+
+@pytest.mark.parametrize("hardlinks", [True, False])
+def test_run_renames_every_name_collision(tmp_path, monkeypatch, hardlinks):
+    if not hardlinks:
+        # Force the copy paths (batched cp + per-file copies), as across filesystems
+        def no_link(src, dst):
+            raise OSError(errno.EXDEV, "cross-device link")
+        monkeypatch.setattr(os, "link", no_link)
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "x.txt").write_text("existing")
+    result = CliRunner().invoke(cli.app, [
+        "run", "--out", str(out), "--save", "**/*.txt", "--",
+        "sh", "-c", "mkdir a b c; echo a > a/x.txt; echo b > b/x.txt; echo c > c/x.txt",
+    ])
+    assert result.exit_code == 0, result.output
+    assert "saved 3 file(s)" in result.output
+    assert (out / "x.txt").read_text() == "existing"
+    saved = sorted(p.read_text() for p in out.iterdir() if p.name != "x.txt")
+    assert saved == ["a\n", "b\n", "c\n"]
+
+
+def test_run_saves_through_symlinked_dir(tmp_path):
+    out = tmp_path / "out"
+    result = CliRunner().invoke(cli.app, [
+        "run", "--out", str(out), "--save", "latest/*.txt", "--",
+        "sh", "-c", "mkdir r; echo hi > r/a.txt; ln -s r latest",
+    ])
+    assert result.exit_code == 0, result.output
+    assert "saved 1 file(s)" in result.output
+    assert (out / "a.txt").read_text() == "hi\n"
+
+
+def test_match_saved_outside_workspace(tmp_path, workspace):
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "x.xml").write_text("x")
+    root = str(workspace)
+    expected = {"../other/x.xml"}
+    assert cli._match_saved(root, ["../other/*.xml"]) == expected
+    assert cli._match_saved(root, [str(other / "*.xml")]) == expected
+    assert cli._match_saved(root, [str(other / "x.xml")]) == expected
+    assert cli._match_saved(root, [str(other / "x.xml"), "../other/*.xml"]) == expected
+
+
+def test_run_recovers_from_failed_batch_cp(tmp_path, monkeypatch):
+    # cp that leaves a partial, read-only copy of every file behind and fails
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    fake_cp = bin_dir / "cp"
+    fake_cp.write_text(
+        "#!/bin/sh\n"
+        'while [ "$1" != "-t" ]; do shift; done; out="$2"; shift 3\n'
+        'for f in "$@"; do echo partial > "$out/$(basename "$f")"; chmod 444 "$out/$(basename "$f")"; done\n'
+        "echo 'cp: simulated failure' >&2; exit 1\n"
+    )
+    fake_cp.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    def no_link(src, dst):
+        raise OSError(errno.EXDEV, "cross-device link")
+    monkeypatch.setattr(os, "link", no_link)
+
+    out = tmp_path / "out"
+    result = CliRunner().invoke(cli.app, [
+        "run", "--out", str(out), "--save", "*.txt", "--",
+        "sh", "-c", "echo a > a.txt; echo b > b.txt",
+    ])
+    assert result.exit_code == 0, result.output
+    assert "saved 2 file(s)" in result.output
+    assert (out / "a.txt").read_text() == "a\n"
+    assert (out / "b.txt").read_text() == "b\n"